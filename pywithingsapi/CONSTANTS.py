@@ -5,13 +5,29 @@ This module contains constants used in the PyWithingsAPI project.
 """
 
 import os
+from types import MappingProxyType
 
 STANDARD_SCOPE = "user.info,user.metrics,user.activity"
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+DATA_DIR = os.path.join(os.path.dirname(_HERE), "data")
 
 TIMEOUT = 10
 
+# Maximum number of POST requests which are sent concurrently, also the size of the connection pool
+MAX_PARALLEL_REQUESTS = 8
+
+# Seconds before the expiration of an access token after which it is refreshed proactively
+TOKEN_REFRESH_SKEW = 60
+
+# Parameters of a WithingsClient and a WithingsUser which are stored in and loaded from JSON files
+CLIENT_PARAMS_KEYS = ("client_id", "client_secret", "redirect_uri", "state", "scope", "demo")
+CLIENT_PARAMS_KEYS_SET = frozenset(CLIENT_PARAMS_KEYS)
+USER_PARAMS_KEYS = ("userid", "access_token", "refresh_token", "scope", "token_type", "expiration_time")
+USER_PARAMS_KEYS_SET = frozenset(USER_PARAMS_KEYS)
+
+URL_API = "https://wbsapi.withings.net/"
 URL_AUTH = "https://account.withings.com/oauth2_user/authorize2"
 URL_OAUTH2_V2 = "https://wbsapi.withings.net/v2/oauth2"
 URL_MEASURE = "https://wbsapi.withings.net/measure"
@@ -19,6 +35,17 @@ URL_MEASURE_V2 = "https://wbsapi.withings.net/v2/measure"
 URL_HEART_V2 = "https://wbsapi.withings.net/v2/heart"
 URL_SLEEP_V2 = "https://wbsapi.withings.net/v2/sleep"
 
+# Names of the endpoints, used as prefix for the names of JSON files with responses
+URL_BASENAME = {
+    URL_MEASURE: "measure",
+    URL_MEASURE_V2: "measure",
+    URL_HEART_V2: "heart",
+    URL_SLEEP_V2: "sleep",
+}
+
+# Measure actions which are not served by URL_MEASURE_V2
+MEASURE_ACTION_URLS = {"getmeas": URL_MEASURE}
+
 START_EQUALS_END_WARNING_STR = (
         "Start and end are equal. No data will be returned."
 )
@@ -30,7 +57,7 @@ TIME_DIFF_GREATER_24H_WARNING_STR = (
         + "Only data for first 24h after startdate will be returned."
 )
 
-MEASURE_GET_ACTIVITY_DATA_FIELDS = [
+MEASURE_GET_ACTIVITY_DATA_FIELDS = (
     "steps",
     "distance",
     "elevation",
@@ -46,10 +73,13 @@ MEASURE_GET_ACTIVITY_DATA_FIELDS = [
     "hr_zone_0",
     "hr_zone_1",
     "hr_zone_2",
-    "hr_zone_3"
-]
+    "hr_zone_3",
+)
 
-MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS = [
+MEASURE_GET_ACTIVITY_DATA_FIELDS_SET = frozenset(MEASURE_GET_ACTIVITY_DATA_FIELDS)
+MEASURE_GET_ACTIVITY_DATA_FIELDS_CSV = ",".join(MEASURE_GET_ACTIVITY_DATA_FIELDS)
+
+MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS = (
     "steps",
     "elevation",
     "calories",
@@ -59,9 +89,12 @@ MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS = [
     "duration",
     "heart_rate",
     "spo2_auto",
-]
+)
 
-MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR = {
+MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS_SET = frozenset(MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS)
+MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS_CSV = ",".join(MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS)
+
+MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR = MappingProxyType({
     1: "weight",
     4: "height",
     5: "fat_free_mass",
@@ -93,14 +126,22 @@ MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR = {
     174: "fat_mass_segments",
     175: "muscle_mass_segments",
     196: "electrodermal_activity",
-}
+})
+
+MEASURE_GET_MEAS_DATA_FIELDS_INT = tuple(MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR.keys())
+MEASURE_GET_MEAS_DATA_FIELDS_STR = tuple(MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR.values())
 
-MEASURE_GET_MEAS_DATA_FIELDS_INT = list(MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR.keys())
-MEASURE_GET_MEAS_DATA_FIELDS_STR = list(MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR.values())
+MEASURE_GET_MEAS_DATA_FIELDS_INT_CSV = ",".join(map(str, MEASURE_GET_MEAS_DATA_FIELDS_INT))
 
 MEASURE_GET_MEAS_DATA_FIELDS_STR_TO_INT = {value: key for key, value in MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR.items()}
 
-MEASURE_GET_WORKOUTS_DATA_FIELDS = [
+# Maps both the integer IDs and the names of the getmeas data fields to the integer IDs
+MEASURE_GET_MEAS_FIELD_ID = {
+    **{key: key for key in MEASURE_GET_MEAS_DATA_FIELDS_INT},
+    **MEASURE_GET_MEAS_DATA_FIELDS_STR_TO_INT
+}
+
+MEASURE_GET_WORKOUTS_DATA_FIELDS = (
     "calories",
     "intensity",
     "manual_distance",
@@ -121,18 +162,24 @@ MEASURE_GET_WORKOUTS_DATA_FIELDS = [
     "pool_laps",
     "strokes",
     "pool_length",
-]
+)
 
-SLEEP_GET_DATA_FIELDS = [
+MEASURE_GET_WORKOUTS_DATA_FIELDS_SET = frozenset(MEASURE_GET_WORKOUTS_DATA_FIELDS)
+MEASURE_GET_WORKOUTS_DATA_FIELDS_CSV = ",".join(MEASURE_GET_WORKOUTS_DATA_FIELDS)
+
+SLEEP_GET_DATA_FIELDS = (
     "hr",
     "rr",
     "snoring",
     "sdnn_1",
     "rmssd",
-    "mvt_score"
-]
+    "mvt_score",
+)
+
+SLEEP_GET_DATA_FIELDS_SET = frozenset(SLEEP_GET_DATA_FIELDS)
+SLEEP_GET_DATA_FIELDS_CSV = ",".join(SLEEP_GET_DATA_FIELDS)
 
-SLEEP_SUMMARY_DATA_FIELDS = [
+SLEEP_SUMMARY_DATA_FIELDS = (
     "nb_rem_episodes",
     "sleep_efficiency",
     "sleep_latency",
@@ -163,5 +210,8 @@ SLEEP_SUMMARY_DATA_FIELDS = [
     "snoringepisodecount",
     "wakeupcount",
     "wakeupduration",
-    "withings_index"
-]
+    "withings_index",
+)
+
+SLEEP_SUMMARY_DATA_FIELDS_SET = frozenset(SLEEP_SUMMARY_DATA_FIELDS)
+SLEEP_SUMMARY_DATA_FIELDS_CSV = ",".join(SLEEP_SUMMARY_DATA_FIELDS)
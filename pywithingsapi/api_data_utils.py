@@ -6,70 +6,214 @@ Module for utility functions for Withings API data
 
 import pandas as pd
 
+# Kinds of nested structures, looked up by the exact type of a value (JSON data only contains plain dicts and lists)
+_FLATTEN_KIND = {dict: "dict", list: "list"}
 
-def flatten_column(df: pd.DataFrame, col: str) -> pd.DataFrame:
+
+def column_kind(series: pd.Series) -> str | None:
+    """
+    Determine whether a column contains dictionaries, lists or neither.
+
+    Only the first non-null element of the column is inspected, so the cost does not depend on the
+    number of rows. Withings API data is homogeneous per key, so the first element is representative
+    of the whole column.
+
+    Args:
+        series (pandas.Series): The column to classify.
+
+    Returns:
+        str or None: "dict" if the column contains dictionaries, "list" if it contains lists,
+            or None if it is empty or contains neither.
+    """
+    first_index = series.first_valid_index()
+    if first_index is None:
+        return None
+    first = series.loc[first_index]
+    if isinstance(first, pd.Series):  # duplicate index labels return all matching rows
+        first = first.iloc[0]
+    return _FLATTEN_KIND.get(type(first))
+
+
+def is_flat_dict_column(series: pd.Series) -> bool:
+    """
+    Check whether a column of dictionaries can be expanded without `pd.json_normalize`.
+
+    This is the case if the column has no missing values and the first dictionary does not contain
+    any dictionaries or lists itself.
+
+    Args:
+        series (pandas.Series): The column containing dictionaries.
+
+    Returns:
+        bool: True if the dictionaries are flat, False otherwise.
+    """
+    if series.empty or not series.notna().all():
+        return False
+    first = series.iloc[0]
+    return type(first) is dict and not any(type(value) in _FLATTEN_KIND for value in first.values())
+
+
+def expand_dict_columns(df: pd.DataFrame, cols: list) -> pd.DataFrame:
     """
-    Flatten a specific column in the DataFrame if it contains either dictionaries or lists.
+    Expand several columns containing dictionaries into multiple columns at once.
 
-    This function checks if all elements in the specified column are dictionaries or lists.
-    If they are dictionaries, it normalizes the column and expands it into multiple columns.
-    If they are lists, it explodes the column to create a new row for each element in the list.
+    All columns are normalized separately and concatenated with the remaining columns in a single
+    step, so the DataFrame is only copied once regardless of the number of expanded columns.
+    Columns of flat dictionaries are built directly, and `pd.json_normalize` is only used for
+    dictionaries which are nested themselves.
+    If a new column name is already taken, the name of the expanded column is appended as suffix.
+    A column which also contains values other than dictionaries or missing values cannot be expanded
+    and is kept unchanged.
+
+    Args:
+        df (pandas.DataFrame): The input DataFrame containing the columns to be expanded.
+        cols (list): The names of the columns to expand. The columns should contain dictionaries.
+
+    Returns:
+        pandas.DataFrame: A new DataFrame with the specified columns expanded.
+    """
+    expanded = {}
+    for col in cols:
+        try:
+            if is_flat_dict_column(df[col]):
+                # Build the frame directly from the list of dictionaries, which is much faster
+                normalized = pd.DataFrame(df[col].tolist(), index=df.index)
+            else:
+                normalized = pd.json_normalize(df[col])
+                normalized.index = df.index
+        except (TypeError, ValueError, AttributeError):
+            # Columns are classified by their first value, so other values may not be dictionaries
+            continue
+        expanded[col] = normalized
+
+    remaining = df.drop(columns=list(expanded))
+    taken = set(remaining.columns)
+    frames = [remaining]
+    for col, normalized in expanded.items():
+        normalized.columns = [f"{name}_{col}" if name in taken else name for name in normalized.columns]
+        taken.update(normalized.columns)
+        frames.append(normalized)
+    return pd.concat(frames, axis=1)
+
+
+def flatten_column(df: pd.DataFrame, col: str, kind: str) -> pd.DataFrame:
+    """
+    Flatten a specific column in the DataFrame which contains either dictionaries or lists.
+
+    If the column contains dictionaries, it normalizes the column and expands it into multiple columns.
+    If it contains lists, it explodes the column to create a new row for each element in the list.
 
     Args:
         df (pandas.DataFrame): The input DataFrame containing the column to be flattened.
-        col (str): The name of the column to flatten. The column should contain dictionaries or lists.
+        col (str): The name of the column to flatten.
+        kind (str): The kind of the column as returned by `column_kind`, either "dict" or "list".
 
     Returns:
         pandas.DataFrame: A new DataFrame with the specified column flattened.
 
     Raises:
-        ValueError: If the column contains data types other than dictionaries or lists.
+        ValueError: If `kind` is neither "dict" nor "list".
     """
-    if df[col].apply(lambda x: isinstance(x, dict)).all():
+    if kind == "dict":
         # Normalize dictionaries and join back
-        return df.drop(columns=[col]).join(pd.json_normalize(df[col]), rsuffix=f'_{col}')
-    elif df[col].apply(lambda x: isinstance(x, list)).all():
+        return expand_dict_columns(df, [col])
+    elif kind == "list":
         # Explode lists
         return df.explode(col).reset_index(drop=True)
     else:
-        raise ValueError(f"Column '{col}' must contain either all dictionaries or all lists.")
+        raise ValueError(f"Column '{col}' must contain either dictionaries or lists.")
+
+
+def normalize_dict(dct: dict, prefix: str = "") -> dict:
+    """
+    Flatten nested dictionaries into a single dictionary with dotted keys, like `pd.json_normalize`.
+
+    Lists are kept as they are.
+
+    Args:
+        dct (dict): The dictionary to normalize.
+        prefix (str, optional): The prefix for all keys of the dictionary. Defaults to "".
+
+    Returns:
+        dict: The normalized dictionary.
+    """
+    flat = {}
+    for key, value in dct.items():
+        if type(value) is dict:
+            flat.update(normalize_dict(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def flatten_record(record: dict) -> list[dict]:
+    """
+    Flatten one record (i.e. one row) of API data into one or more rows without nested structures.
+
+    Dictionaries are expanded into multiple keys with dotted names like `pd.json_normalize` creates them,
+    and lists are exploded into one row per element, where an empty list results in a missing value.
+    If an expanded key is already taken, the name of the expanded key is appended as suffix.
+
+    Args:
+        record (dict): The record to flatten.
+
+    Returns:
+        list[dict]: The flattened rows.
+    """
+    for key, value in record.items():
+        kind = _FLATTEN_KIND.get(type(value))
+        if kind == "dict":
+            row = {k: v for k, v in record.items() if k != key}
+            for name, sub_value in normalize_dict(value).items():
+                row[f"{name}_{key}" if name in row else name] = sub_value
+            return flatten_record(row)
+        if kind == "list":
+            items = value if value else [float("nan")]  # Exploding an empty list results in a missing value
+            return [row for item in items for row in flatten_record({**record, key: item})]
+    return [record]
+
+
+def flat_records_to_df(records: list[dict]) -> pd.DataFrame:
+    """
+    Flatten records of API data with `flatten_record` and build a DataFrame from the flattened rows.
+
+    Args:
+        records (list[dict]): The records, i.e. the rows, to flatten.
+
+    Returns:
+        pandas.DataFrame: The flattened DataFrame.
+    """
+    return pd.DataFrame.from_records([row for record in records for row in flatten_record(record)])
 
 
 def recursive_flatten(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Recursively flatten all nested structures (dictionaries or lists) in a DataFrame.
+    Flatten all nested structures (dictionaries or lists) in a DataFrame.
 
-    This function iterates over the columns of the DataFrame and flattens any column containing
-    nested structures like dictionaries or lists. It continues to do so recursively until no more
-    nested structures are present in the DataFrame.
+    The rows of the DataFrame are flattened with `flatten_record`, so the result is the same as for
+    `api_data_to_pandas_df`. Nested values are flattened per row: if a column contains dictionaries
+    in some rows and other values, e.g. None, in others, the dictionaries are expanded into multiple
+    columns and the other values are kept in the original column. The result has a new RangeIndex.
 
     Args:
-        df (pandas.DataFrame): The DataFrame to recursively flatten.
+        df (pandas.DataFrame): The DataFrame to flatten.
 
     Returns:
         pandas.DataFrame: The fully flattened DataFrame.
-
-    Raises:
-        ValueError: If an error occurs while flattening a specific column.
     """
-    nested_columns = [col for col in df.columns if df[col].apply(lambda x: isinstance(x, (dict, list))).all()]
-    if not nested_columns:  # Base case: No nested structures left
+    if df.empty:
         return df
-    for col in nested_columns:
-        try:
-            df = flatten_column(df, col)
-        except ValueError as e:
-            raise ValueError(f"Error processing column '{col}': {e}")
-    return recursive_flatten(df)  # Recursively process remaining nested structures
+    return flat_records_to_df(df.to_dict("records"))
 
 
 def api_data_to_pandas_df(api_data: dict | list) -> pd.DataFrame:
     """
-    Converts the API data to a Pandas DataFrame and recursively flatten any nested structures.
+    Converts the API data to a Pandas DataFrame and flattens any nested structures.
 
     This function takes the API data (which you got as the answer from a POST request) as input,
-    converts it to a Pandas DataFrame, and then recursively flattens any nested dictionaries or
-    lists within it.
+    splits it into records, flattens any nested dictionaries or lists within each record in plain
+    Python, and builds the DataFrame from the flattened rows in a single step. A dictionary without
+    any nested structures is converted to a DataFrame with a single row directly.
 
     Args:
         api_data (dict or list): The API data to be converted into a DataFrame.
@@ -78,12 +222,18 @@ def api_data_to_pandas_df(api_data: dict | list) -> pd.DataFrame:
         pandas.DataFrame: The flattened DataFrame.
 
     Raises:
-        ValueError: If the API data cannot be converted to a DataFrame or if any column
-                    contains unsupported data types for flattening.
+        ValueError: If the API data cannot be converted to a DataFrame.
     """
-    try:
-        initial_df = pd.DataFrame(api_data)  # Converts the initial API data into a DataFrame
-    except ValueError as e:
-        raise ValueError(f"Cannot convert initial API data to DataFrame: {e}")
+    if type(api_data) is dict and not any(type(value) in _FLATTEN_KIND for value in api_data.values()):
+        return pd.DataFrame([api_data])  # Nothing to flatten
+
+    if isinstance(api_data, list) and all(isinstance(item, dict) for item in api_data):
+        records = api_data
+    else:
+        try:
+            # Splits the initial API data into records in the same way a DataFrame would be built
+            records = pd.DataFrame(api_data).to_dict("records")
+        except ValueError as e:
+            raise ValueError(f"Cannot convert initial API data to DataFrame: {e}")
 
-    return recursive_flatten(initial_df)  # Call recursive function to flatten the DataFrame
+    return flat_records_to_df(records)
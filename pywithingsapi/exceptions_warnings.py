@@ -4,34 +4,70 @@ exceptions_warnings.py module
 This module provides custom exceptions and custom warnings for the PyWithingsAPI project.
 """
 
+import functools
 import warnings
 
 
 class WithingsStatusNotZeroError(Exception):
     """Exception raised when a Withings API response has a status of 200 but the Withings status is not 0."""
     def __init__(self, data: dict, url: str, dct: dict):
-        """Initialize the WithingsStatusNotZeroError exception with a detailed message.
+        """Initialize the WithingsStatusNotZeroError exception.
+
+        The detailed message is only rendered when the exception is converted to a string,
+        so raising and catching it does not format the (possibly large) request data.
 
         Args:
             data (dict): The data sent in the post request.
             url (str): The URL to which the post request was sent.
             dct (dict): The dictionary containing the response details, including status code and error message.
         """
-        self.message = (
+        self.data = data
+        self.url = url
+        self.dct = dct
+        super().__init__(url)
+
+    @property
+    def message(self) -> str:
+        """str: The detailed error message."""
+        return (
             f"The post request response status is 200, i.e. the post request was successful, "
             f"but the Withings status is not 0.\n"
-            f"Withings status code: {dct['status']}\n"
-            f"Withings error message: {dct['error']}\n"
-            f"URL: {url}\n"
-            f"Data: {data}"
+            f"Withings status code: {self.dct['status']}\n"
+            f"Withings error message: {self.dct.get('error')}\n"
+            f"URL: {self.url}\n"
+            f"Data: {self.data}"
         )
-        super().__init__(self.message)
+
+    def __str__(self) -> str:
+        return self.message
+
+
+@functools.lru_cache(maxsize=None)
+def short_fct_name(fct_name: str) -> str:
+    """Strips the `data_` prefix from the name of a function creating request data, e.g. `data_sleep_get`.
+
+    Args:
+        fct_name (str): The name of the function.
+
+    Returns:
+        str: The name without the `data_` prefix, e.g. `sleep_get`.
+    """
+    return fct_name.removeprefix('data_')
 
 
 class InvalidDataFieldWarning(Warning):
-    def __init__(self, fct_name, data_field):
-        # Format the message dynamically with the parameter
-        message = f"{data_field} is not a valid data field for {fct_name.removeprefix("data_")} " + \
-            "and will not be used in the request."
-        # Initialize the base Warning class with the constructed message
+    """Warning issued when a data field is not valid for a Withings API request and will be dropped."""
+    message_template = (
+        "{data_field} is not a valid data field for {short_fct_name} and will not be used in the request."
+    )
+
+    def __init__(self, short_fct_name: str, data_field):
+        """Initialize the InvalidDataFieldWarning with a message built from the class-level template.
+
+        Args:
+            short_fct_name (str): The name of the function which creates the request data without the
+                `data_` prefix, as returned by `short_fct_name`, e.g. `sleep_get`.
+            data_field: The invalid data field.
+        """
+        message = self.message_template.format(data_field=data_field, short_fct_name=short_fct_name)
         super().__init__(message)
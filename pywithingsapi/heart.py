@@ -13,6 +13,7 @@ from pywithingsapi import utils
 from pywithingsapi.withings_user import WithingsUser
 
 
+@utils.memoize_request_data
 def data_heart_get(signalid: int) -> dict:
     """
     Creates a dictionary for retrieving a specific heart signal (with the specified signal ID)
@@ -32,6 +33,7 @@ def data_heart_get(signalid: int) -> dict:
     return {"action": "get", "signalid": signalid}
 
 
+@utils.memoize_request_data
 def data_heart_list(startdate: int = None, enddate: int = None, offset: int = 0) -> dict:
     """
     Creates a dictionary for listing heart signals within a date range from the Withings API.
@@ -56,20 +58,25 @@ def data_heart_list(startdate: int = None, enddate: int = None, offset: int = 0)
     return {"action": "list", "startdate": startdate, "enddate": enddate, "offset": offset}
 
 
-def post_request_heart(data: dict, user: WithingsUser, to_json: bool = False) -> dict:
+def post_request_heart(data: dict | list[dict], user: WithingsUser, to_json: bool = False) -> dict | list[dict]:
     """
     Sends a POST request to the Withings API to retrieve heart data.
 
     This function sends a request with the provided data and user authentication.
+    If a list of request data is provided, the requests are sent concurrently.
     If `to_json` is set to True, the response is saved as a JSON file.
 
     Args:
-        data (dict, required): A dictionary containing the request data ( from `data_heart_get` or `data_heart_list`).
+        data (dict or list, required): A dictionary containing the request data ( from `data_heart_get` or
+            `data_heart_list`), or a list of such dictionaries.
         user (WithingsUser, required): An instance of `WithingsUser` containing the user credentials and headers.
         to_json (bool, optional): If set to True, the response is saved as a JSON file in the user's folder.
             Defaults to False.
 
     Returns:
-        dict: The response from the API parsed as a dictionary.
+        dict or list: The response from the API parsed as a dictionary, or a list of responses if a list of
+            request data was provided.
     """
+    if isinstance(data, list):
+        return post_request.get_data_dict_many(data, CONST.URL_HEART_V2, user, to_json)
     return post_request.get_data_dict(data, CONST.URL_HEART_V2, user, to_json)
@@ -5,21 +5,20 @@ This module provides functionality for interacting with the Withings API to
 retrieve user measurement and activity data.
 """
 
-import warnings
 
 from pywithingsapi import CONSTANTS as CONST
-from pywithingsapi import exceptions_warnings
 from pywithingsapi import post_request
 from pywithingsapi import utils
 from pywithingsapi.withings_user import WithingsUser
 
 
+@utils.memoize_request_data
 def data_measure_get_activity(
         startdate: int = None,
         enddate: int = None,
         lastupdate: int = None,
         offset: int = 0,
-        data_fields: str | list[str] = CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS
+        data_fields: str | list[str] | tuple[str, ...] = CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS
 ) -> dict:
     """
         Creates a dictionary for retrieving activity data within a specified date range or after a specified
@@ -51,16 +50,13 @@ def data_measure_get_activity(
     startdateymd, enddateymd, lastupdate = \
         utils.handle_start_end_update_ymd(startdate, enddate, lastupdate)
 
-    if isinstance(data_fields, str):
-        data_fields = [data_fields]  # Normalize single value to list
-
-    for data_field in data_fields:
-        if data_field not in CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS:
-            warnings.warn(exceptions_warnings.InvalidDataFieldWarning(data_measure_get_activity.__name__, data_field))
-            data_fields.remove(data_field)
-
-    if len(data_fields) == 0:  # if no valid data field remains after removing invalid data fields
-        data_fields = CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS
+    data_fields_csv = utils.normalize_data_fields(
+        data_fields,
+        CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS_SET,
+        CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS,
+        CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS_CSV,
+        data_measure_get_activity.__name__
+    )
 
     return {
         "action": "getactivity",
@@ -68,15 +64,16 @@ def data_measure_get_activity(
         "enddateymd": enddateymd,
         "lastupdate": lastupdate,
         "offset": offset,
-        "data_fields": ",".join(data_fields)
+        "data_fields": data_fields_csv
     }
 
 
+@utils.memoize_request_data
 def data_measure_get_intradayactivity(
         startdate: int = None,
         enddate: int = None,
         lastupdate: int = None,
-        data_fields: str | list[str] = CONST.MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS
+        data_fields: str | list[str] | tuple[str, ...] = CONST.MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS
 ) -> dict:
     """
     Creates a dictionary for retrieving intraday activity data.
@@ -105,35 +102,31 @@ def data_measure_get_intradayactivity(
     utils.warn_if_start_equals_end(startdate, enddate)
     utils.warn_if_time_diff_greater_24h(startdate, enddate)
 
-    if isinstance(data_fields, str):
-        data_fields = [data_fields]  # Normalize single value to list
-
-    for data_field in data_fields:
-        if data_field not in CONST.MEASURE_GET_ACTIVITY_DATA_FIELDS:
-            warnings.warn(
-                exceptions_warnings.InvalidDataFieldWarning(data_measure_get_intradayactivity.__name__, data_field)
-            )
-            data_fields.remove(data_field)
-
-    if len(data_fields) == 0:  # if no valid data field remains after removing invalid data fields
-        data_fields = CONST.MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS
+    data_fields_csv = utils.normalize_data_fields(
+        data_fields,
+        CONST.MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS_SET,
+        CONST.MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS,
+        CONST.MEASURE_GET_INTRADAYACTIVITY_DATA_FIELDS_CSV,
+        data_measure_get_intradayactivity.__name__
+    )
 
     return {
         "action": "getintradayactivity",
         "startdate": startdate,
         "enddate": enddate,
         "lastupdate": lastupdate,
-        "data_fields": ",".join(data_fields)
+        "data_fields": data_fields_csv
     }
 
 
+@utils.memoize_request_data
 def data_measure_get_meas(
         startdate: int = None,
         enddate: int = None,
         lastupdate: int = None,
         offset: int = 0,
         category: int = 1,
-        data_fields: int | str | list[int | str] = CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT
+        data_fields: int | str | list[int | str] | tuple[int, ...] = CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT
 ) -> dict:
     """
     Prepares a dictionary of parameters for the Withings API 'getmeas' action.
@@ -168,28 +161,7 @@ def data_measure_get_meas(
     utils.warn_if_end_before_start(startdate, enddate)
     utils.warn_if_start_equals_end(startdate, enddate)
 
-    meastypes_list = []
-
-    if isinstance(data_fields, (int, str)):
-        data_fields = [data_fields]  # Normalize single value to list
-
-    for data_field in data_fields:
-        if isinstance(data_field, int) and data_field in CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT:
-            meastypes_list.append(data_field)
-        elif isinstance(data_field, str) and data_field in CONST.MEASURE_GET_MEAS_DATA_FIELDS_STR:
-            meastypes_list.append(CONST.MEASURE_GET_MEAS_DATA_FIELDS_STR_TO_INT[data_field])
-        else:
-            warnings.warn(exceptions_warnings.InvalidDataFieldWarning(data_measure_get_meas.__name__, data_field))
-
-    if len(meastypes_list) == 0:  # if no valid data field remains after removing invalid data fields
-        meastype = None
-        meastypes = ",".join(map(str, CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT))
-    elif len(meastypes_list) == 1:
-        meastype = meastypes_list[0]
-        meastypes = None
-    else:
-        meastype = None
-        meastypes = ",".join(map(str, meastypes_list))
+    meastype, meastypes = utils.normalize_meastypes(data_fields, data_measure_get_meas.__name__)
 
     if category not in (1, 2):
         raise ValueError("The parameter 'category' must be 1 for real measures or 2 for user objectives.")
@@ -206,24 +178,25 @@ def data_measure_get_meas(
     }
 
 
+@utils.memoize_request_data
 def data_measure_get_workouts(
     startdate: int = None,
     enddate: int = None,
     lastupdate: int = None,
     offset: int = 0,
-    data_fields: list[str] = CONST.MEASURE_GET_WORKOUTS_DATA_FIELDS
+    data_fields: str | list[str] | tuple[str, ...] = CONST.MEASURE_GET_WORKOUTS_DATA_FIELDS
 ) -> dict:
 
     startdateymd, enddateymd, lastupdate = \
         utils.handle_start_end_update_ymd(startdate, enddate, lastupdate)
 
-    for data_field in data_fields:
-        if data_field not in CONST.MEASURE_GET_WORKOUTS_DATA_FIELDS:
-            warnings.warn(exceptions_warnings.InvalidDataFieldWarning(data_measure_get_workouts.__name__, data_field))
-            data_fields.remove(data_field)
-
-    if len(data_fields) == 0:  # if no valid data field remains after removing invalid data fields
-        data_fields = CONST.MEASURE_GET_WORKOUTS_DATA_FIELDS
+    data_fields_csv = utils.normalize_data_fields(
+        data_fields,
+        CONST.MEASURE_GET_WORKOUTS_DATA_FIELDS_SET,
+        CONST.MEASURE_GET_WORKOUTS_DATA_FIELDS,
+        CONST.MEASURE_GET_WORKOUTS_DATA_FIELDS_CSV,
+        data_measure_get_workouts.__name__
+    )
 
     return {
         "action": "getworkouts",
@@ -231,28 +204,36 @@ def data_measure_get_workouts(
         "enddateymd": enddateymd,
         "lastupdate": lastupdate,
         "offset": offset,
-        "data_fields": ",".join(data_fields)
+        "data_fields": data_fields_csv
     }
 
 
-def post_request_measure(data: dict, user: WithingsUser, to_json: bool = False) -> dict:
+def post_request_measure(data: dict | list[dict], user: WithingsUser, to_json: bool = False) -> dict | list[dict]:
     """
     Sends a POST request to the Withings API to retrieve measurements, activity or workout data.
 
     This function sends a request with the provided data and user authentication.
+    If a list of request data is provided, the requests are sent concurrently. In this case,
+    all requests must be sent to the same endpoint, i.e. either all or none of them must be `getmeas` requests.
     If `to_json` is set to True, the response is saved as a JSON file.
 
     Args:
-        data (dict, required): A dictionary containing the request data.
+        data (dict or list, required): A dictionary containing the request data, or a list of such dictionaries.
         user (WithingsUser, required): An instance of `WithingsUser` containing the user credentials and headers.
         to_json (bool, optional): If set to True, the response is saved as a JSON file in the user's folder.
             Defaults to False.
 
     Returns:
-        dict: The response from the API parsed as a dictionary.
+        dict or list: The response from the API parsed as a dictionary, or a list of responses if a list of
+            request data was provided.
+
+    Raises:
+        ValueError: If a list of request data is provided which must be sent to different endpoints.
     """
-    if dict["action"] == "getmeas":
-        url = CONST.URL_MEASURE
-    else:
-        url = CONST.URL_MEASURE_V2
+    if isinstance(data, list):
+        urls = {CONST.MEASURE_ACTION_URLS.get(d["action"], CONST.URL_MEASURE_V2) for d in data}
+        if len(urls) > 1:
+            raise ValueError("All request data in the list must be sent to the same endpoint.")
+        return post_request.get_data_dict_many(data, urls.pop() if urls else CONST.URL_MEASURE_V2, user, to_json)
+    url = CONST.MEASURE_ACTION_URLS.get(data["action"], CONST.URL_MEASURE_V2)
     return post_request.get_data_dict(data, url, user, to_json)
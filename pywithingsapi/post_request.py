@@ -4,17 +4,40 @@ post.request.py module
 This module provides functions for making POST requests to the Withings API.
 """
 
-import json
+from __future__ import annotations
+
 import requests
+import logging
 import os
-import time
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from requests.adapters import HTTPAdapter
 
 from pywithingsapi import CONSTANTS as CONST
 from pywithingsapi import exceptions_warnings
-from pywithingsapi.withings_user import WithingsUser
+from pywithingsapi import utils
+
+if TYPE_CHECKING:  # withings_user imports this module, so only import it for type checking
+    from pywithingsapi.withings_user import WithingsUser
 
+logger = logging.getLogger(__name__)
 
-def post_request(url: str, data: dict, headers: dict = None) -> requests.Response:
+# Session shared by all POST requests, so connections to the Withings API are kept alive and reused
+_SESSION = requests.Session()
+_SESSION.mount(CONST.URL_API, HTTPAdapter(pool_connections=4, pool_maxsize=CONST.MAX_PARALLEL_REQUESTS))
+
+
+def close_session():
+    """
+    Closes the HTTP session shared by all POST requests and its pooled connections.
+    """
+    _SESSION.close()
+
+
+def post_request(url: str, data: dict, headers: dict = None, stream: bool = False) -> requests.Response:
     """
     Sends a POST request to a specified URL with the provided data and headers.
 
@@ -22,6 +45,8 @@ def post_request(url: str, data: dict, headers: dict = None) -> requests.Respons
         url (str): The URL to send the POST request to.
         data (dict): A dictionary containing the data to send in the POST request body.
         headers (dict, optional): A dictionary of HTTP headers to send with the request. Defaults to None.
+        stream (bool, optional): If set to True, the response body is not downloaded immediately and can be
+            read from `response.raw`. The caller must close the response. Defaults to False.
 
     Returns:
         requests.Response: The response object from the POST request.
@@ -29,23 +54,105 @@ def post_request(url: str, data: dict, headers: dict = None) -> requests.Respons
     Raises:
         requests.RequestException: If an error occurs during the POST request.
     """
+    res = None
     try:
-        res = requests.post(url=url, headers=headers, data=data, timeout=CONST.TIMEOUT)
+        res = _SESSION.post(url=url, headers=headers, data=data, timeout=CONST.TIMEOUT, stream=stream)
         res.raise_for_status()
         return res
 
     except requests.RequestException as e:
-        print(f"Error during post request: {e}")
-        print("Post request url:", url)
-        print("Post request data:", data)
+        if res is not None:
+            res.close()  # releases the connection of a streamed response to the pool
+        # The data is not logged, because it contains the client secret and tokens for the OAuth requests
+        logger.error("Error during post request to %s (action %s): %s", url, data.get("action"), e)
         raise
 
 
+# Matches the Withings status at the start of a response, where the API sends it as the first key
+_STATUS_PATTERN = re.compile(rb'\s*\{\s*"status"\s*:\s*(-?\d+)')
+
+
+def _json_filename(url: str, data: dict, suffix: str = "") -> str:
+    """
+    Creates the name of the JSON file in which the response for a request is saved.
+
+    Args:
+        url (str): The URL the request is sent to.
+        data (dict): The data sent in the request.
+        suffix (str, optional): Appended to the file name before the extension. Defaults to "".
+
+    Returns:
+        str: The file name, consisting of the name of the endpoint, the action and the suffix.
+    """
+    basename = CONST.URL_BASENAME.get(url)
+    if basename is None:
+        basename = url.split('/')[-1]
+    return f"{basename}_{data['action']}{suffix}.json"
+
+
+def refresh_token_if_expiring(user: WithingsUser):
+    """
+    Refreshes the access token of the user if it expires within `CONST.TOKEN_REFRESH_SKEW` seconds.
+
+    Args:
+        user (WithingsUser): The user whose access token is checked.
+    """
+    if utils.token_expires_soon(user.expiration_time):
+        user.refresh_existing_token()
+
+
+def _save_body_json(body: dict, data: dict, url: str, user: WithingsUser):
+    """
+    Saves the body of a response as a JSON file in the user's folder.
+
+    Args:
+        body (dict): The body of the response.
+        data (dict): The data sent in the POST request, which determines the name of the file.
+        url (str): The URL the POST request was sent to, which determines the name of the file.
+        user (WithingsUser): The user, which is necessary to find the user's folder.
+    """
+    try:
+        with open(os.path.join(user.user_folder_path, _json_filename(url, data)), "wb") as f:
+            f.write(utils.json_dumps(body, indent=True))
+    except OSError as e:
+        logger.error("An error occurred while accessing the directory or writing the file (%s, %s).",
+                     e, type(e).__name__)
+
+
+def _request_body(data: dict, url: str, headers: dict, user: WithingsUser, to_json: bool) -> dict:
+    """
+    Sends a POST request with already created headers and returns the body of the response.
+
+    Args:
+        data (dict): The data to be sent in the POST request.
+        url (str): The URL to send the POST request to.
+        headers (dict): The headers created by `user.create_headers()`.
+        user (WithingsUser): The user, which is necessary to find the user's folder.
+        to_json (bool): If set to True, the response is saved as a JSON file in the user's folder.
+
+    Returns:
+        dict: The body of the response parsed as a dictionary.
+
+    Raises:
+        WithingsStatusNotZeroError: If the Withings status of the response is not 0.
+    """
+    dct = utils.json_loads(post_request(url, data, headers).content)
+
+    if dct["status"] != 0:
+        raise exceptions_warnings.WithingsStatusNotZeroError(data, url, dct)
+
+    if to_json:
+        _save_body_json(dct["body"], data, url, user)
+
+    return dct["body"]
+
+
 def get_data_dict(data: dict, url: str, user: WithingsUser, to_json: bool = False) -> dict:
     """
     Sends a POST request with the provided data and returns the response as a dictionary.
 
     This function sends a POST request to the given URL with the specified data and user authentication headers.
+    If the access token of the user expires within `CONST.TOKEN_REFRESH_SKEW` seconds, it is refreshed first.
     If the `to_json` flag is set to True, the response is saved as a JSON file in the user's directory.
 
     Args:
@@ -61,25 +168,103 @@ def get_data_dict(data: dict, url: str, user: WithingsUser, to_json: bool = Fals
     Raises:
         OSError: If an error occurs while accessing the directory or writing the file.
     """
-    if user.expiration_time < int(time.time()):
-        user.refresh_existing_token()
+    refresh_token_if_expiring(user)
+    return _request_body(data, url, user.create_headers(), user, to_json)
+
+
+def get_data_dict_many(datas: list[dict], url: str, user: WithingsUser, to_json: bool = False) -> list[dict]:
+    """
+    Sends several independent POST requests concurrently and returns the responses as dictionaries.
+
+    The access token is checked and the headers are created only once. Then, up to
+    `CONST.MAX_PARALLEL_REQUESTS` requests are sent at the same time, so their network latency overlaps.
+    If the `to_json` flag is set to True, each response is saved as a JSON file in the user's directory
+    like in `get_data_dict`. The files are written once all responses have arrived. For requests with
+    the same action, only the response of the last of them in `datas` is written to the file.
+
+    Args:
+        datas (list[dict]): The data for each POST request.
+        url (str): The URL to send the POST requests to.
+        user (WithingsUser): An instance of `WithingsUser` which is necessary to create the headers
+        to_json (bool, optional): If set to True, the responses are saved as JSON files in the user's folder.
+            Defaults to False.
 
+    Returns:
+        list[dict]: The response contents parsed as dictionaries, in the same order as `datas`.
+    """
+    if not datas:
+        return []
+
+    refresh_token_if_expiring(user)
     headers = user.create_headers()
-    response = post_request(url, data, headers)
-    dct = json.loads(response.content)
 
-    if dct["status"] != 0:
-        raise exceptions_warnings.WithingsStatusNotZeroError(data, url, dct)
+    with ThreadPoolExecutor(max_workers=min(len(datas), CONST.MAX_PARALLEL_REQUESTS)) as executor:
+        bodies = list(executor.map(lambda data: _request_body(data, url, headers, user, False), datas))
 
     if to_json:
-        user_folder = f"user_{user.userid}"
-        filename = url.split('/')[-1] + "_" + data["action"] + ".json"
+        # Written here instead of in the worker threads, which would write to the same file concurrently.
+        # Responses for the same file would overwrite each other, so only the last one is written.
+        last_per_file = {_json_filename(url, data): (data, body) for data, body in zip(datas, bodies)}
+        for data, body in last_per_file.values():
+            _save_body_json(body, data, url, user)
 
+    return bodies
+
+
+def save_data_json(data: dict, url: str, user: WithingsUser) -> str:
+    """
+    Sends a POST request and streams the response directly into a JSON file in the user's folder.
+
+    Unlike `get_data_dict` with `to_json=True`, the response is neither parsed into a dictionary nor
+    serialized again, so it is never held in memory as a whole. Therefore, the file contains the complete
+    response as sent by the Withings API, i.e. the data is found under the key "body". To distinguish it
+    from the files written by `get_data_dict`, which only contain the body, its name ends with `_response`,
+    e.g. `sleep_getsummary_response.json`. Use this function if you only need the file and not the
+    returned data.
+
+    The Withings status is read from the start of the response, the rest of the response is not validated.
+    If the request or the download fails, e.g. due to a read timeout, or if the status is not 0 or cannot
+    be read, no file is written.
+
+    Args:
+        data (dict): The data to be sent in the POST request.
+        url (str): The URL to send the POST request to.
+        user (WithingsUser): An instance of `WithingsUser` which is necessary to create the headers
+
+    Returns:
+        str: The path of the written file.
+
+    Raises:
+        WithingsStatusNotZeroError: If the Withings status of the response is not 0.
+        OSError: If an error occurs while accessing the directory or writing the file.
+    """
+    refresh_token_if_expiring(user)
+
+    path = os.path.join(user.user_folder_path, _json_filename(url, data, "_response"))
+    tmp_path = path + ".tmp"
+
+    response = post_request(url, data, user.create_headers(), stream=True)
+    try:
         try:
-            with open(os.path.join(CONST.DATA_DIR, user_folder, filename), "w",
-                      encoding="utf-8") as f:
-                json.dump(dct["body"], f, indent=4)
-        except OSError as e:
-            print(f"An error occurred while accessing the directory or writing the file ({e}, {type(e).__name__}).")
+            response.raw.decode_content = True
+            with open(tmp_path, "wb") as f:
+                shutil.copyfileobj(response.raw, f)
+        finally:
+            response.close()
 
-    return dct["body"]
+        with open(tmp_path, "rb") as f:
+            match = _STATUS_PATTERN.match(f.read(64))
+        if match is None or int(match.group(1)) != 0:
+            # Only parse the whole response if the status cannot be read from its start; errors are small
+            with open(tmp_path, "rb") as f:
+                dct = utils.json_loads(f.read())
+            if dct["status"] != 0:
+                raise exceptions_warnings.WithingsStatusNotZeroError(data, url, dct)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Never leave a partial or invalid response behind, e.g. after a read timeout or a malformed body
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
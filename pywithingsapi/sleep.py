@@ -6,19 +6,17 @@ This module provides functions for retrieving sleep data from the Withings API.
 It includes functionality for fetching high-frequency sleep data, sleep summaries, and handling
 POST requests to the Withings API.
 """
-import warnings
-
 from pywithingsapi import CONSTANTS as CONST
-from pywithingsapi import exceptions_warnings
 from pywithingsapi import post_request
 from pywithingsapi import utils
 from pywithingsapi.withings_user import WithingsUser
 
 
+@utils.memoize_request_data
 def data_sleep_get(
         startdate: int,
         enddate: int,
-        data_fields: list[str] = CONST.SLEEP_GET_DATA_FIELDS) -> dict:
+        data_fields: str | list[str] | tuple[str, ...] = CONST.SLEEP_GET_DATA_FIELDS) -> dict:
     """
     Creates a data dictionary for making a POST request to get sleep data
     captured at high frequency, including sleep stages, from the
@@ -31,7 +29,7 @@ def data_sleep_get(
             period (Unix timestamp).
         enddate (int): The end datetime of the sleep data retrieval
             period (Unix timestamp).
-        data_fields (list, optional): The data fields to be retrieved.
+        data_fields (str or list, optional): The data field or data fields to be retrieved.
             Defaults to `CONST.SLEEP_GET_DATA_FIELDS`, which includes all available fields.
 
     Returns:
@@ -42,24 +40,25 @@ def data_sleep_get(
     utils.warn_if_start_equals_end(startdate, enddate)
     utils.warn_if_time_diff_greater_24h(startdate, enddate)
 
-    for data_field in data_fields:
-        if data_field not in CONST.SLEEP_GET_DATA_FIELDS:
-            warnings.warn(exceptions_warnings.InvalidDataFieldWarning(data_sleep_get.__name__, data_field))
-            data_fields.remove(data_field)
-
-    if len(data_fields) == 0:  # if no valid data field remains after removing invalid data fields
-        data_fields = CONST.SLEEP_GET_DATA_FIELDS
+    data_fields_csv = utils.normalize_data_fields(
+        data_fields,
+        CONST.SLEEP_GET_DATA_FIELDS_SET,
+        CONST.SLEEP_GET_DATA_FIELDS,
+        CONST.SLEEP_GET_DATA_FIELDS_CSV,
+        data_sleep_get.__name__
+    )
 
     return {'action': "get", 'startdate': startdate,
-            'enddate': enddate, 'data_fields': ",".join(data_fields)}
+            'enddate': enddate, 'data_fields': data_fields_csv}
 
 
+@utils.memoize_request_data
 def data_sleep_summary(
         startdate: int = None,
         enddate: int = None,
         lastupdate: int = None,
         offset: int = 0,
-        data_fields: list[str] = CONST.SLEEP_SUMMARY_DATA_FIELDS
+        data_fields: str | list[str] | tuple[str, ...] = CONST.SLEEP_SUMMARY_DATA_FIELDS
 ) -> dict:
     """
     Creates a data dictionary for retrieving a summary of sleep data from the
@@ -80,7 +79,7 @@ def data_sleep_summary(
         lastupdate (int, optional): The last update timestamp for the data (Unix timestamp).
             Defaults to None.
         offset (int, optional): The offset for paginated data. Defaults to 0.
-        data_fields (list, optional): A list of data fields to be included in the summary.
+        data_fields (str or list, optional): The data field or data fields to be included in the summary.
             Defaults to `CONST.SLEEP_SUMMARY_DATA_FIELDS`.
 
     Returns:
@@ -91,34 +90,38 @@ def data_sleep_summary(
         utils.handle_start_end_update_ymd(startdate, enddate, lastupdate)
     utils.ensure_non_negative_int_or_none(offset)
 
-    for data_field in data_fields:
-        if data_field not in CONST.SLEEP_SUMMARY_DATA_FIELDS:
-            warnings.warn(exceptions_warnings.InvalidDataFieldWarning(data_sleep_summary.__name__, data_field))
-            data_fields.remove(data_field)
-
-    if len(data_fields) == 0:  # if no valid data field remains after removing invalid data fields
-        data_fields = CONST.SLEEP_SUMMARY_DATA_FIELDS
+    data_fields_csv = utils.normalize_data_fields(
+        data_fields,
+        CONST.SLEEP_SUMMARY_DATA_FIELDS_SET,
+        CONST.SLEEP_SUMMARY_DATA_FIELDS,
+        CONST.SLEEP_SUMMARY_DATA_FIELDS_CSV,
+        data_sleep_summary.__name__
+    )
 
     return {'action': "getsummary", 'startdateymd': startdateymd,
             'enddateymd': enddateymd, 'lastupdate': lastupdate,
-            'offset': offset, 'data_fields': ",".join(data_fields)}
+            'offset': offset, 'data_fields': data_fields_csv}
 
 
-def post_request_sleep(data: dict, user: WithingsUser, to_json: bool = False) -> dict:
+def post_request_sleep(data: dict | list[dict], user: WithingsUser, to_json: bool = False) -> dict | list[dict]:
     """
     Sends a POST request to the Withings API to retrieve sleep data.
 
     This function sends a request with the provided data and user authentication.
+    If a list of request data is provided, the requests are sent concurrently.
     If `to_json` is set to True, the response is saved as a JSON file.
 
     Args:
-        data (dict, required): A dictionary containing the request data
-            (from `data_sleep_get` or `data_sleep_summary`).
+        data (dict or list, required): A dictionary containing the request data
+            (from `data_sleep_get` or `data_sleep_summary`), or a list of such dictionaries.
         user (WithingsUser, required): An instance of `WithingsUser` containing the user credentials and headers.
         to_json (bool, optional): If set to True, the response is saved as a JSON file in the user's folder.
             Defaults to False.
 
     Returns:
-        dict: The response from the API parsed as a dictionary.
+        dict or list: The response from the API parsed as a dictionary, or a list of responses if a list of
+            request data was provided.
     """
+    if isinstance(data, list):
+        return post_request.get_data_dict_many(data, CONST.URL_SLEEP_V2, user, to_json)
     return post_request.get_data_dict(data, CONST.URL_SLEEP_V2, user, to_json)
@@ -5,9 +5,142 @@ This module provides utility functions for the PyWithingsAPI project.
 """
 
 import datetime as dt
+import functools
+import json
+import os
+import time
 import warnings
+from collections.abc import Iterable
 
 from pywithingsapi import CONSTANTS as CONST
+from pywithingsapi import exceptions_warnings
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, without it the json module of the standard library is used
+    orjson = None
+
+# json.dumps creates a new encoder for every call with non-default arguments, these encoders are shared instead
+_json_encode_compact = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+_json_encode_indented = json.JSONEncoder(indent=2, ensure_ascii=False).encode
+
+
+def json_loads(content: bytes | str):
+    """
+    Parses JSON content, using orjson if it is installed.
+
+    Args:
+        content (bytes or str): The JSON content.
+
+    Returns:
+        The parsed content, e.g. a dictionary.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """
+    Serializes an object to UTF-8 encoded JSON, using orjson if it is installed.
+
+    Args:
+        obj: The object to serialize, e.g. a dictionary.
+        indent (bool, optional): If set to True, the JSON is indented by 2 spaces (the only indentation
+            supported by orjson). Otherwise, it is written compactly. Defaults to False.
+
+    Returns:
+        bytes: The serialized object.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return _json_encode_indented(obj).encode("utf-8")
+    return _json_encode_compact(obj).encode("utf-8")
+
+
+def write_bytes_if_changed(path: str, payload: bytes) -> bool:
+    """
+    Writes `payload` to the file at `path`, unless the file already contains exactly these bytes.
+
+    The payload is first written to a temporary file next to `path`, which then replaces the target file,
+    so readers never see a partially written file. If writing fails, the temporary file is removed.
+
+    Args:
+        path (str): The path of the file.
+        payload (bytes): The content of the file.
+
+    Returns:
+        bool: True if the file was written, False if it was already up to date.
+
+    Raises:
+        OSError: If an error occurs while reading or writing the file.
+    """
+    try:
+        with open(path, 'rb') as file:
+            if file.read() == payload:
+                return False
+    except FileNotFoundError:
+        pass
+
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def _hashable_argument(value):
+    """
+    Converts an argument of a `data_*` function to a value which can be used as cache key.
+
+    Strings, tuples and values which are not iterable are returned as they are. Any other iterable,
+    e.g. a list or set of data fields, is converted to a tuple.
+
+    Args:
+        value: The argument.
+
+    Returns:
+        The argument, or a tuple of its elements.
+    """
+    if isinstance(value, (str, bytes, tuple)) or not isinstance(value, Iterable):
+        return value
+    return tuple(value)
+
+
+def memoize_request_data(fct):
+    """
+    Decorator which caches the request data dictionaries created by the `data_*` functions.
+
+    The `data_*` functions only depend on their arguments, but are called repeatedly with the same
+    arguments when paginating or polling. Iterables in the arguments other than strings, e.g. lists or sets,
+    are converted to tuples so they can be used as cache keys. Arguments of different types are cached
+    separately, e.g. `1` and `1.0`, so the returned dictionary always contains the values as passed.
+    A copy of the cached dictionary is returned so callers can modify it without affecting the cache.
+    Warnings are only issued on the first call with the same arguments.
+
+    Args:
+        fct (callable): The function creating the request data dictionary.
+
+    Returns:
+        callable: The wrapped function with the additional methods `cache_info` and `cache_clear`.
+    """
+    cached_fct = functools.lru_cache(maxsize=256, typed=True)(fct)
+
+    @functools.wraps(fct)
+    def wrapper(*args, **kwargs):
+        args = tuple(_hashable_argument(arg) for arg in args)
+        kwargs = {key: _hashable_argument(value) for key, value in kwargs.items()}
+        return dict(cached_fct(*args, **kwargs))
+
+    wrapper.cache_info = cached_fct.cache_info
+    wrapper.cache_clear = cached_fct.cache_clear
+    return wrapper
 
 
 def ensure_non_negative_int_or_none(*parameters: int | None):
@@ -26,11 +159,145 @@ def ensure_non_negative_int_or_none(*parameters: int | None):
         ValueError: If any parameter is not a non-negative integer or None, the function
             raises an exception with a message identifying the invalid parameter.
     """
-    for param in list(parameters):
-        if not (isinstance(param, int) and param >= 0 or param is None):
+    for param in parameters:
+        if param is None:
+            continue
+        if not (isinstance(param, int) and param >= 0):
             raise ValueError(f"Invalid parameter: {param}. Must be a non-negative integer or None.")
 
 
+def normalize_data_fields(data_fields: str | list[str] | tuple[str, ...],
+                          valid_data_fields: frozenset[str],
+                          default_data_fields: tuple[str, ...],
+                          default_data_fields_csv: str,
+                          fct_name: str) -> str:
+    """
+    Validates the requested data fields and joins them to the comma-separated string expected by the
+    Withings API.
+
+    A single data field may be passed as a string. Invalid data fields are removed from the request
+    and an `InvalidDataFieldWarning` is issued for each of them. If no valid data field remains,
+    the default data fields are used. If the default data fields are requested, they are not
+    validated again and the precomputed string is returned.
+
+    Args:
+        data_fields (str, list or tuple): The requested data field or data fields.
+        valid_data_fields (frozenset): The data fields which are valid for the request.
+        default_data_fields (tuple): The data fields which are used if no valid data field remains.
+        default_data_fields_csv (str): The default data fields as comma-separated string.
+        fct_name (str): The name of the function creating the request data, used in the warning message.
+
+    Returns:
+        str: A comma-separated string of the valid data fields.
+    """
+    if data_fields is default_data_fields:
+        return default_data_fields_csv
+
+    if isinstance(data_fields, str):
+        data_fields = [data_fields]  # Normalize single value to list
+
+    valid = []
+    for data_field in data_fields:
+        if data_field in valid_data_fields:
+            valid.append(data_field)
+        else:
+            warnings.warn(
+                exceptions_warnings.InvalidDataFieldWarning(exceptions_warnings.short_fct_name(fct_name), data_field),
+                stacklevel=2
+            )
+
+    if len(valid) == 0:  # if no valid data field remains after removing invalid data fields
+        return default_data_fields_csv
+
+    return ",".join(valid)
+
+
+def normalize_meastypes(data_fields: int | str | list[int | str] | tuple[int, ...],
+                        fct_name: str) -> tuple[int | None, str | None]:
+    """
+    Validates the requested measure types of a 'getmeas' request and converts them to the `meastype` and
+    `meastypes` parameters expected by the Withings API.
+
+    Measure types may be given as integer IDs or as names, see `CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT_TO_STR`.
+    A single measure type may be passed as an integer or string. Invalid measure types are removed from the
+    request and an `InvalidDataFieldWarning` is issued for each of them. If no valid measure type remains,
+    all measure types are requested.
+
+    Args:
+        data_fields (int, str, list or tuple): The requested measure type or measure types.
+        fct_name (str): The name of the function creating the request data, used in the warning message.
+
+    Returns:
+        tuple: `(meastype, meastypes)`. If exactly one measure type is requested, `meastype` is its ID and
+            `meastypes` is None. Otherwise `meastype` is None and `meastypes` is a comma-separated string of IDs.
+    """
+    if data_fields is CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT:
+        return None, CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT_CSV
+
+    if isinstance(data_fields, (int, str)):
+        data_fields = [data_fields]  # Normalize single value to list
+
+    field_id = CONST.MEASURE_GET_MEAS_FIELD_ID.get
+    meastypes_list = []
+    for data_field in data_fields:
+        meastype_id = field_id(data_field)
+        if meastype_id is not None:
+            meastypes_list.append(meastype_id)
+        else:
+            warnings.warn(
+                exceptions_warnings.InvalidDataFieldWarning(exceptions_warnings.short_fct_name(fct_name), data_field),
+                stacklevel=2
+            )
+
+    if len(meastypes_list) == 0:  # if no valid data field remains after removing invalid data fields
+        return None, CONST.MEASURE_GET_MEAS_DATA_FIELDS_INT_CSV
+    if len(meastypes_list) == 1:
+        return meastypes_list[0], None
+    return None, ",".join(map(str, meastypes_list))
+
+
+def unix_time_now() -> int:
+    """
+    Returns the current time as unix timestamp in whole seconds.
+
+    Returns:
+        int: The current unix timestamp.
+    """
+    return time.time_ns() // 1_000_000_000
+
+
+def token_expires_soon(expiration_time: int) -> bool:
+    """
+    Checks whether an access token is expired or expires within `CONST.TOKEN_REFRESH_SKEW` seconds.
+
+    Tokens which are about to expire are treated as expired, so they are refreshed before a request
+    sent with them reaches the API.
+
+    Args:
+        expiration_time (int): The unix timestamp at which the access token expires.
+
+    Returns:
+        bool: True if the access token should be refreshed, False otherwise.
+    """
+    return expiration_time - CONST.TOKEN_REFRESH_SKEW <= unix_time_now()
+
+
+@functools.lru_cache(maxsize=1024)
+def timestamp_to_ymd(timestamp: int) -> dt.date:
+    """
+    Converts a unix timestamp to a date in YMD format, i.e. the time of the day is removed.
+
+    The results are cached, because paginated requests convert the same timestamps repeatedly.
+
+    Args:
+        timestamp (int): The timestamp in unix format.
+
+    Returns:
+        dt.date: The date of the timestamp in local time.
+    """
+    return dt.date.fromtimestamp(timestamp)
+
+
 def handle_start_end_update_ymd(startdate: int = None,
                                 enddate: int = None,
                                 lastupdate: int = None) -> (dt.date, dt.date, int):
@@ -73,8 +340,8 @@ def handle_start_end_update_ymd(startdate: int = None,
     if startdate is not None and enddate is not None:
         # Both startdate and enddate were provided, but not lastupdate
         warn_if_end_before_start(startdate, enddate)
-        startdateymd = dt.date.fromtimestamp(startdate)
-        enddateymd = dt.date.fromtimestamp(enddate)
+        startdateymd = timestamp_to_ymd(startdate)
+        enddateymd = timestamp_to_ymd(enddate)
     else:
         # Only the parameter lastupdate was provided
         startdateymd = None
@@ -115,5 +382,5 @@ def warn_if_time_diff_greater_24h(start: int, end: int):
         start (int): The start time in unix format.
         end (int): The end time in unix format.
     """
-    if (end - start) / 3600 > 24:
+    if start is not None and end is not None and end - start > 24 * 3600:
         warnings.warn(CONST.TIME_DIFF_GREATER_24H_WARNING_STR, Warning)
@@ -6,15 +6,25 @@ It includes functionality to initialize the client, load parameters from a dicti
 and store them in a JSON file.
 """
 
-import json
+from __future__ import annotations
+
+import hmac
+import logging
+import operator
 import os
 import urllib.parse as urlparse
 import uuid
-
-import requests
+from typing import TYPE_CHECKING
 
 from pywithingsapi import CONSTANTS as CONST
-from pywithingsapi import post_request
+from pywithingsapi import utils
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+_get_client_params = operator.attrgetter(*CONST.CLIENT_PARAMS_KEYS)
 
 
 class WithingsClient:
@@ -33,7 +43,7 @@ class WithingsClient:
         demo (bool): A flag indicating whether the client is in demo mode.
     """
 
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str, state: str = str(uuid.uuid4()),
+    def __init__(self, client_id: str, client_secret: str, redirect_uri: str, state: str | None = None,
                  scope: str = CONST.STANDARD_SCOPE, demo: bool = False):
         """
         Initializes a WithingsClient instance and stores the parameters in a JSON file.
@@ -42,17 +52,21 @@ class WithingsClient:
             client_id (str): The client ID for the Withings API.
             client_secret (str): The client secret for the Withings API.
             redirect_uri (str): The redirect URI for OAuth2 authentication.
-            state (str): A string to maintain state between the request and callback. Defaults to str(uuid.uuid4()).
+            state (str, optional): A string to maintain state between the request and callback. Defaults to None,
+                in which case a new random state is generated with `uuid.uuid4().hex`.
             scope (str, optional): The scope of the API access. Defaults to CONST.STANDARD_SCOPE.
             demo (bool, optional): A flag indicating whether the client is in demo mode. Defaults to False.
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
-        self.state = state
+        self.state = state if state is not None else uuid.uuid4().hex
         self.scope = scope
         self.demo = demo
 
+        self._auth_url = None
+        self._auth_url_params = None
+
         self.store_client_params()
 
     @classmethod
@@ -63,6 +77,7 @@ class WithingsClient:
         Args:
             data (dict): A dictionary containing the parameters needed to create a WithingsClient instance.
                 Must include "client_id", "client_secret", "redirect_uri", "state", "scope", and "demo".
+                Other keys are ignored.
 
         Returns:
             WithingsClient: A new instance of WithingsClient.
@@ -73,9 +88,9 @@ class WithingsClient:
         """
         if not isinstance(data, dict):
             raise TypeError("Input must be a dictionary.")
-        if not all(key in data for key in ["client_id", "client_secret", "redirect_uri", "state", "scope", "demo"]):
+        if not CONST.CLIENT_PARAMS_KEYS_SET.issubset(data):
             raise KeyError("At least one key is missing in the dictionary.")
-        return cls(**data)
+        return cls(**{key: data[key] for key in CONST.CLIENT_PARAMS_KEYS})
 
     def store_client_params(self):
         """
@@ -83,29 +98,29 @@ class WithingsClient:
 
         The file name depends on whether the client is in demo mode or not.
         Creates the data directory if it does not exist and handles file writing errors.
+        The file is only rewritten if its content changes.
 
         Raises:
             OSError: If an error occurs while accessing or creating the dictionary or while writing the file.
         """
         try:
-            if not os.path.exists(CONST.DATA_DIR):
-                os.makedirs(CONST.DATA_DIR)
+            os.makedirs(CONST.DATA_DIR, exist_ok=True)
 
-            client_params = {
-                key: getattr(self, key)
-                for key in ["client_id", "client_secret", "redirect_uri", "state", "scope", "demo"]
-            }
+            client_params = dict(zip(CONST.CLIENT_PARAMS_KEYS, _get_client_params(self)))
 
             client_params_file_name = 'client_params_demo.json' if self.demo else 'client_params.json'
 
             try:
-                with open(os.path.join(CONST.DATA_DIR, client_params_file_name), 'w') as file:
-                    json.dump(client_params, file, indent=4)
+                utils.write_bytes_if_changed(
+                    os.path.join(CONST.DATA_DIR, client_params_file_name),
+                    utils.json_dumps(client_params)
+                )
             except OSError as e:
-                print(f"An error occurred while writing the file ({e}, {type(e).__name__}).")
+                logger.error("An error occurred while writing the file (%s, %s).", e, type(e).__name__)
 
         except OSError as e:
-            print(f"An error occurred while accessing or creating the directory ({e}, {type(e).__name__}).")
+            logger.error("An error occurred while accessing or creating the directory (%s, %s).",
+                         e, type(e).__name__)
 
     def create_auth_url(self) -> str:
         """
@@ -116,19 +131,22 @@ class WithingsClient:
         `response_type`, `client_id`, `scope`, `redirect_uri`, and `state`. If the
         `demo` flag is enabled, a `mode=demo` parameter is appended to the URL.
 
+        The URL is cached and only rebuilt when one of the parameters it is built from changes.
+
         Returns:
             str: The full authentication URL with encoded parameters for user authorization.
         """
-        auth_params = {
-            "response_type": "code",
-            "client_id": self.client_id,
-            "scope": self.scope,
-            "redirect_uri": self.redirect_uri,
-            "state": self.state
-        }
-        if self.demo:
-            auth_params["mode"] = "demo"
-        return CONST.URL_AUTH + "?" + urlparse.urlencode(auth_params)
+        params = (self.client_id, self.scope, self.redirect_uri, self.state, self.demo)
+        if params != self._auth_url_params:
+            self._auth_url = (
+                f"{CONST.URL_AUTH}?response_type=code&client_id={urlparse.quote_plus(self.client_id)}"
+                f"&scope={urlparse.quote_plus(self.scope)}&redirect_uri={urlparse.quote_plus(self.redirect_uri)}"
+                f"&state={urlparse.quote_plus(self.state)}"
+            )
+            if self.demo:
+                self._auth_url += "&mode=demo"
+            self._auth_url_params = params
+        return self._auth_url
 
     def post_request_access(self, code: str) -> requests.Response:
         """
@@ -145,6 +163,9 @@ class WithingsClient:
             requests.Response: The response object from the POST request, which contains the access token
             if the request is successful.
         """
+        # imported here, so creating a client and its auth URL does not import requests
+        from pywithingsapi import post_request
+
         url = CONST.URL_OAUTH2_V2
         data = {
             "action": "requesttoken",
@@ -169,7 +190,7 @@ class WithingsClient:
             and additional information.
 
         Raises:
-            ValueError: If returned state is not equal to original state.
+            ValueError: If returned state is not equal to original state or the URL does not contain a code.
         """
         print("Please open the following link in your browser and confirm: ")
         auth_url = self.create_auth_url()
@@ -177,11 +198,19 @@ class WithingsClient:
         print("Be aware that the code in the URL is only valid for 30 seconds.")
         url = input("Please enter the URL you were redirected to after logging in: ")
 
-        returned_state = urlparse.parse_qs(urlparse.urlparse(url).query).get("state")[0]
-
-        if returned_state != self.state:
+        returned_state = my_code = None
+        for key, value in urlparse.parse_qsl(urlparse.urlparse(url).query):
+            if key == "state":
+                returned_state = value
+            elif key == "code":
+                my_code = value
+            if returned_state is not None and my_code is not None:
+                break
+
+        # constant-time comparison, so the state cannot be guessed from response timings
+        if returned_state is None or not hmac.compare_digest(returned_state.encode(), self.state.encode()):
             raise ValueError("Invalid state parameter.")
+        if my_code is None:
+            raise ValueError("The URL does not contain a code parameter.")
 
-        my_code = urlparse.parse_qs(urlparse.urlparse(url).query).get("code")[0]
-
-        return json.loads(self.post_request_access(my_code).content)
+        return utils.json_loads(self.post_request_access(my_code).content)
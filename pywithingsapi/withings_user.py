@@ -6,16 +6,24 @@ such as token storage, user folder creation, API request authorization and refre
 an existing access token.
 """
 
-import json
+import logging
+import operator
 import os
-import time
 
 import requests
 
 from pywithingsapi import CONSTANTS as CONST
 from pywithingsapi import post_request
+from pywithingsapi import utils
 from pywithingsapi import withings_client
 
+logger = logging.getLogger(__name__)
+
+_get_user_params = operator.attrgetter(*CONST.USER_PARAMS_KEYS)
+_get_user_data = operator.itemgetter(*CONST.USER_PARAMS_KEYS)
+# the token response contains the lifetime of the access token instead of its expiration time
+_get_token_data = operator.itemgetter("userid", "access_token", "refresh_token", "scope", "token_type", "expires_in")
+
 
 class WithingsUser:
     """
@@ -34,6 +42,7 @@ class WithingsUser:
         token_type (str): The type of the access and refresh token
         expiration_time (int): The time the access token expires
         user_folder (str): The name of the folder where the token and user data are saved
+        user_folder_path (str): The path of the folder where the token and user data are saved
 
     """
 
@@ -50,31 +59,31 @@ class WithingsUser:
             KeyError: If any expected keys are missing from the provided data or the token response.
         """
         self.api_client = api_client
-
-        keys = ["userid", "access_token", "refresh_token", "scope", "token_type", "expiration_time"]
+        self._cached_headers = None
+        self._cached_headers_token = None
 
         if data is not None:
-            for key in keys:
-                try:
-                    setattr(self, key, data[key])
-                except KeyError:
-                    raise KeyError(f"Key '{key}' is missing from the provided data.")
+            try:
+                (self.userid, self.access_token, self.refresh_token, self.scope, self.token_type,
+                 self.expiration_time) = _get_user_data(data)
+            except KeyError as e:
+                raise KeyError(f"Key '{e.args[0]}' is missing from the provided data.")
 
-            if self.expiration_time < int(time.time()):
+            if utils.token_expires_soon(self.expiration_time):
                 self.user_folder = self.create_user_folder()
                 self.refresh_existing_token()
 
         else:
             token_data = self.api_client.access_new_token()["body"]
-            print(token_data)
 
-            for key in keys:
-                try:
-                    setattr(self, key, token_data[key])
-                except KeyError:
-                    raise KeyError(f"Key '{key}' is missing from the token data.")
+            try:
+                self.userid, self.access_token, self.refresh_token, self.scope, self.token_type, expires_in = \
+                    _get_token_data(token_data)
+            except KeyError as e:
+                raise KeyError(f"Key '{e.args[0]}' is missing from the token data.")
 
-            self.expiration_time = int(time.time()) + token_data["expires_in"]
+            self.expiration_time = utils.unix_time_now() + expires_in
+            logger.debug("Received a new access token for user %s, valid for %s seconds.", self.userid, expires_in)
 
         self.user_folder = self.create_user_folder()
         self.store_user_params()
@@ -97,8 +106,7 @@ class WithingsUser:
         """
         if not isinstance(data, dict):
             raise TypeError("Input must be a dictionary.")
-        if not all(key in data for key in ["userid", "access_token", "refresh_token", "scope", "token_type",
-                                           "expiration_time"]):
+        if not CONST.USER_PARAMS_KEYS_SET.issubset(data):
             raise KeyError("At least one key is missing in the dictionary.")
         return cls(api, data)
 
@@ -107,7 +115,8 @@ class WithingsUser:
         Creates a directory for storing user-specific data.
 
         The directory is named `user_<userid>` and is created inside the `data` folder defined
-        in the CONSTANTS.py module.
+        in the CONSTANTS.py module. Its path is stored in `user_folder_path`, together with the path of the
+        `user_params.json` file written by `store_user_params`.
 
         Returns:
             str: The name of the created user folder.
@@ -115,52 +124,54 @@ class WithingsUser:
         Raises:
             OSError: If an error occurs during the creation of the directory.
         """
+        user_folder = f"user_{self.userid}"
+        self.user_folder_path = os.path.join(CONST.DATA_DIR, user_folder)
+        self._user_params_path = os.path.join(self.user_folder_path, 'user_params.json')
         try:
-            user_folder = f"user_{self.userid}"
-            if not os.path.exists(os.path.join(CONST.DATA_DIR, user_folder)):
-                os.makedirs(os.path.join(CONST.DATA_DIR, user_folder))
+            os.makedirs(self.user_folder_path, exist_ok=True)
             return user_folder
         except OSError as e:
-            print(f"An error occurred while accessing or creating the directory ({e}, {type(e).__name__}).")
+            logger.error("An error occurred while accessing or creating the directory (%s, %s).", e, type(e).__name__)
 
     def store_user_params(self):
         """
         Stores user parameters such as access tokens and user ID in a JSON file.
 
         The file is saved in the user's folder and contains user data including the demo status.
+        It is only rewritten if its content changes.
 
         Raises:
             OSError: If an error occurs during the writing of the file.
         """
-        user_params_file_path = os.path.join(CONST.DATA_DIR, self.user_folder, 'user_params.json')
-
-        user_data = {
-            key: getattr(self, key)
-            for key in ["userid", "access_token", "refresh_token", "scope", "token_type", "expiration_time"]
-        }
+        user_data = dict(zip(CONST.USER_PARAMS_KEYS, _get_user_params(self)))
 
         user_data["demo"] = self.api_client.demo
 
         try:
-            with open(user_params_file_path, 'w') as file:
-                json.dump(user_data, file, indent=4)
+            utils.write_bytes_if_changed(self._user_params_path, utils.json_dumps(user_data))
         except OSError as e:
-            print(f"An error occurred while writing the file ({e}, {type(e).__name__}).")
+            logger.error("An error occurred while writing the file (%s, %s).", e, type(e).__name__)
 
     def create_headers(self) -> dict:
         """
         Creates the authorization headers required for making API requests.
 
-        This method constructs an authorization header using the token type and access token.
+        This method constructs an authorization header using the token type and access token. The headers
+        are cached and only rebuilt when the access token changes, so the returned dictionary is shared
+        between requests and must not be modified.
 
         Returns:
             dict: A dictionary containing the authorization header and content type.
         """
-        auth = " ".join([self.token_type, self.access_token])
-        return {
-            "Authorization": auth,
+        if self._cached_headers is not None and self._cached_headers_token == self.access_token:
+            return self._cached_headers
+
+        self._cached_headers = {
+            "Authorization": f"{self.token_type} {self.access_token}",
             "Content-Type": "application/x-www-form-urlencoded",
         }
+        self._cached_headers_token = self.access_token
+        return self._cached_headers
 
     def post_request_refresh(self) -> requests.Response:
         """
@@ -190,10 +201,12 @@ class WithingsUser:
 
         It retrieves the updated tokens and stores them in a JSON file.
         """
-        res = json.loads(self.post_request_refresh().content)["body"]
+        res = utils.json_loads(self.post_request_refresh().content)["body"]
 
         self.access_token = res["access_token"]
         self.refresh_token = res["refresh_token"]
-        self.expiration_time = int(time.time()) + res["expires_in"]
+        self.expiration_time = utils.unix_time_now() + res["expires_in"]
+        self._cached_headers = None
+        self._cached_headers_token = None
 
         self.store_user_params()